@@ -80,7 +80,7 @@ class ShiftRegister:
         self.SRCLR = ShiftRegister._make_pin(SRCLR, 1)
 
         # Storing the amount of connected shift registers
-        if order > 0:
+        if N_SR > 0:
             self.N_SR = int(N_SR)
         else:
             raise ValueError('Number of shift registers hase to be positive')
@@ -184,6 +184,18 @@ class ShiftRegister:
         self.RCLK.value(1)
         self.RCLK.value(0)
 
+    def configure(self, data=0):
+        """
+        This function will set the data attribute to the given value and
+        write it out to the output. Unlike write_register, a value of zero is
+        also written, so the outputs always end up in a known state.
+        Returns the number of times the data was latched onto the output.
+        """
+
+        self.data = data & (2 ** (8 * self.N_SR) - 1)
+        self.write_register()
+        return 1
+
     def write_byte(self, data, byte=0):
         """
         This function will first set a byte in the data attribute and then
@@ -300,3 +312,4 @@ class ShiftRegisterPins:
 
 if __name__ == '__main__':
     # run some test program
+    pass
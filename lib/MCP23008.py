@@ -56,14 +56,20 @@ class MCP23008:
     PIN_INPUT_NOPULLUP = 1
     PIN_INPUT_PULLUP = 2
 
-    def __init__(self, address, baudrate=100000):
+    def __init__(self, address, baudrate=100000, i2c=None):
         """
         Constructor for the MCP23008 object. This method will save the address
         of the IC and start an I2C object with the given baudrate. For now the
         I2C object can only be made on BUS0 and as a master.
+        When an existing I2C object is given, that bus is used instead and no
+        new peripheral is initialised. This allows several IC's to share one
+        bus.
         """
         self.address = address
-        self.i2c = I2C(0, I2C.MASTER, baudrate=baudrate)
+        if i2c is None:
+            self.i2c = I2C(0, I2C.MASTER, baudrate=baudrate)
+        else:
+            self.i2c = i2c
 
     def write(self, data):
         """
@@ -138,6 +144,40 @@ class MCP23008:
         self.i2c.writeto_mem(self.address, MCP23008._IODIR,
                              bytes([reg_mode]))
 
+    def configure(self, direction, pullup=0x00, data=0x00,
+                  reset_iocon=False, latch_first=False):
+        """
+        Method to set the direction, pullups and output latches of all pins.
+        The IC's sequential mode is used to write every register from IODIR
+        up to OLAT in a single I2C transaction. Polarity, interrupt and IOCON
+        registers are written with their power-on value of zero.
+        Because IODIR is written before OLAT, new outputs drive the old latch
+        value for the duration of the burst, unless latch_first is set.
+        :param direction: Byte for the IODIR register, a 1 makes a pin input.
+        :param pullup: Byte for the GPPU register, a 1 enables the pullup.
+        :param data: Byte for the output latches.
+        :param reset_iocon: First clear IOCON, so the burst also works when
+                            sequential mode was disabled. One extra write.
+        :param latch_first: First write OLAT, so the outputs start at data
+                            without a transient. One extra write.
+        :return: The number of I2C transactions made.
+        """
+        transactions = 1
+        if reset_iocon:
+            self.i2c.writeto_mem(self.address, MCP23008._IOCON, bytes([0x00]))
+            transactions += 1
+        if latch_first:
+            self.i2c.writeto_mem(self.address, MCP23008._OLAT,
+                                 bytes([data & 0xFF]))
+            transactions += 1
+
+        # IODIR, IPOL, GPINTEN, DEFVAL, INTCON, IOCON, GPPU, INTF, INTCAP,
+        # GPIO, OLAT; INTF and INTCAP are read-only and ignore the write.
+        registers = bytes([direction & 0xFF, 0x00, 0x00, 0x00, 0x00, 0x00,
+                           pullup & 0xFF, 0x00, 0x00,
+                           data & 0xFF, data & 0xFF])
+        self.i2c.writeto_mem(self.address, MCP23008._IODIR, registers)
+        return transactions
 
 class MCP23008_pins:
     """
@@ -206,3 +246,4 @@ class MCP23008_pins:
 
 if __name__ == '__main__':
     # run some test program
+    pass
@@ -28,33 +28,40 @@ __author__ = 'P. Cassiman'
 class MCP23017:
     """
     Class for controlling the MCP23017 IO-expander.
+    The register addresses are those of the power-on layout (IOCON.BANK = 0),
+    in which the registers of bank A and bank B are interleaved. The driver
+    never switches the IC to the other layout.
     """
 
     # A-bank
     _IODIRA = 0x00
-    _IPOLA = 0x01
-    _GPINTENA = 0x02
-    _DEFVALA = 0x03
-    _INTCONA = 0x04
-    _IOCONA = 0x05
-    _GPPUA = 0x06
-    _INTFA = 0x07
-    _INTCAPA = 0x08
-    _GPIOA = 0x09
-    _OLATA = 0x0A
+    _IPOLA = 0x02
+    _GPINTENA = 0x04
+    _DEFVALA = 0x06
+    _INTCONA = 0x08
+    _IOCONA = 0x0A
+    _GPPUA = 0x0C
+    _INTFA = 0x0E
+    _INTCAPA = 0x10
+    _GPIOA = 0x12
+    _OLATA = 0x14
 
     # B-bank
-    _IODIRB = 0x10
-    _IPOLB = 0x11
-    _GPINTENB = 0x12
-    _DEFVALB = 0x13
-    _INTCONB = 0x14
-    _IOCONB = 0x15
-    _GPPUB = 0x16
-    _INTFB = 0x17
-    _INTCAPB = 0x18
-    _GPIOB = 0x19
-    _OLATB = 0x1A
+    _IODIRB = 0x01
+    _IPOLB = 0x03
+    _GPINTENB = 0x05
+    _DEFVALB = 0x07
+    _INTCONB = 0x09
+    _IOCONB = 0x0B
+    _GPPUB = 0x0D
+    _INTFB = 0x0F
+    _INTCAPB = 0x11
+    _GPIOB = 0x13
+    _OLATB = 0x15
+
+    # Address of IOCON when the IC has been switched to IOCON.BANK = 1. In
+    # the power-on layout this address is GPINTENB.
+    _IOCON_BANK1 = 0x05
 
     baudrate_100kHz = 100000
     baudrate_400kHz = 400000
@@ -64,14 +71,19 @@ class MCP23017:
     PIN_INPUT_PULLUP = 2
 
 
-    def __init__(self, address, baudrate=100000):
+    def __init__(self, address, baudrate=100000, i2c=None):
         """
         Constructor for the MCP23017 object
         param: address: The I2C address of the IO-expander
         param: baudrate: The frequency at which to communicate with the IC
+        param: i2c: An existing I2C object to share, instead of starting a
+                    new one on BUS0
         """
         self.address = address
-        self.i2c = I2C(0, I2C.MASTER, baudrate=baudrate)
+        if i2c is None:
+            self.i2c = I2C(0, I2C.MASTER, baudrate=baudrate)
+        else:
+            self.i2c = i2c
 
     def write(self, bank, data):
         """
@@ -114,6 +126,56 @@ class MCP23017:
         """
         raise NotImplementedError
 
+    def configure(self, direction, pullup=(0x00, 0x00), data=(0x00, 0x00),
+                  reset_iocon=False, latch_first=False):
+        """
+        Function for setting the direction, pullups and output latches of
+        both banks. Because the registers of both banks are interleaved, they
+        are all written with one sequential write from IODIRA to OLATB.
+        Polarity, interrupt and IOCON registers are written with their
+        power-on value.
+        Because IODIR is written before OLAT, new outputs drive the old latch
+        value for the duration of the burst, unless latch_first is set.
+        param: direction: Tuple with the IODIR byte of bank A and bank B
+        param: pullup: Tuple with the GPPU byte of bank A and bank B
+        param: data: Tuple with the output latch byte of bank A and bank B
+        param: reset_iocon: First clear IOCON at its IOCON.BANK = 1 and at its
+                            power-on address, so the burst also works when the
+                            layout or sequential mode was changed. Two extra
+                            writes.
+        param: latch_first: First write OLATA and OLATB, so the outputs start
+                            at data without a transient. One extra write.
+        return: The number of I2C transactions made
+        """
+        transactions = 1
+        if reset_iocon:
+            # In the power-on layout the first write only clears GPINTENB,
+            # which the burst does as well.
+            self.i2c.writeto_mem(self.address, MCP23017._IOCON_BANK1,
+                                 bytes([0x00]))
+            self.i2c.writeto_mem(self.address, MCP23017._IOCONA,
+                                 bytes([0x00]))
+            transactions += 2
+        if latch_first:
+            self.i2c.writeto_mem(self.address, MCP23017._OLATA,
+                                 bytes([data[0] & 0xFF, data[1] & 0xFF]))
+            transactions += 1
+
+        registers = bytearray(MCP23017._OLATB - MCP23017._IODIRA + 1)
+        banks = ((MCP23017._IODIRA, MCP23017._GPPUA, MCP23017._GPIOA,
+                  MCP23017._OLATA),
+                 (MCP23017._IODIRB, MCP23017._GPPUB, MCP23017._GPIOB,
+                  MCP23017._OLATB))
+        for bank in range(2):
+            iodir, gppu, gpio, olat = banks[bank]
+            registers[iodir] = direction[bank] & 0xFF
+            registers[gppu] = pullup[bank] & 0xFF
+            # writing GPIO writes the output latch as well
+            registers[gpio] = data[bank] & 0xFF
+            registers[olat] = data[bank] & 0xFF
+        self.i2c.writeto_mem(self.address, MCP23017._IODIRA, registers)
+        return transactions
+
 
 class MCP23017_pins:
     """
@@ -156,3 +218,4 @@ class MCP23017_pins:
 
 if __name__ == '__main__':
     # run some test program
+    pass
@@ -0,0 +1,323 @@
+"""
+File that contains the classes for describing a board declaratively.
+A board description is a dict (or a JSON file) that lists the IO-expanders and
+shift registers on the board, together with their pin modes, pullups and
+initial output states.
+The drivers are only imported and instantiated when a device is first used.
+All I2C devices share a single I2C object, so the peripheral is initialised
+only once. The bring_up method then applies the initial configuration of
+every device in one ordered pass, with by default a single bus transaction
+per device.
+
+The IO-expanders are written in one sequential burst that starts at IODIR.
+This relies on the IC's registers still being in their power-on state:
+- IOCON is kept by the IC through a soft reset of the microcontroller. When
+  other code may have changed it (sequential mode off, or the MCP23017 in
+  IOCON.BANK = 1), set "reset_iocon" on the device to clear IOCON first.
+- Pins that become outputs drive the old latch value (0 after power-on)
+  until the burst reaches OLAT, about 1 ms on an MCP23008 and 2 ms on an
+  MCP23017 at 100 kHz. Set "latch_first" on the device to write the latches
+  before the burst, so outputs start at their initial value.
+Both options cost extra transactions, which show up in the stats.
+
+Example of a board description:
+
+{
+    "i2c": {"bus": 0, "baudrate": 400000},
+    "devices": [
+        {"name": "leds", "type": "MCP23008", "address": 32,
+         "mode": "output", "value": 15, "latch_first": true},
+        {"name": "buttons", "type": "MCP23017", "address": 33,
+         "banks": [{"mode": "input_pullup"},
+                   {"mode": "output", "pins": {"7": "input"}}]},
+        {"name": "segments", "type": "ShiftRegister", "count": 2,
+         "pins": {"SER": 10, "SRCLK": 11, "RCLK": 12, "OE": 13, "SRCLR": 14},
+         "value": 0}
+    ]
+}
+
+The devices are a list so the order of the bring-up is the order in which
+they are described.
+"""
+
+################################## TODO #######################################
+
+
+########################### Import statements #################################
+import json
+import time
+
+from machine import I2C
+
+
+######################### Variable declarations ###############################
+__version__ = 1.0
+__author__ = 'P. Cassiman'
+
+# Pin modes as they can be written in a board description
+_MODES = {
+    'output': 0,
+    'input': 1,
+    'input_pullup': 2,
+}
+
+# Per device type, the keys a description needs and the keys it may not have
+_KEYS = {
+    'MCP23008': (('address',), ('banks', 'count', 'order')),
+    'MCP23017': (('address', 'banks'),
+                 ('mode', 'pins', 'value', 'count', 'order')),
+    'ShiftRegister': (('pins',),
+                      ('address', 'banks', 'mode', 'reset_iocon',
+                       'latch_first')),
+}
+
+_SHIFT_REGISTER_PINS = ('SER', 'SRCLK', 'RCLK', 'OE', 'SRCLR')
+
+
+######################### Function declarations ###############################
+
+
+def _port_registers(config):
+    """
+    Function for turning the description of one 8-bit port into the values
+    for the direction, pullup and output latch registers.
+    A port is described by a default mode for all pins, an optional mode per
+    pin and the initial value of the output latches.
+    :param config: dict with the optional keys mode, pins and value.
+    :return: tuple with the direction, pullup and data bytes.
+    """
+
+    default = _mode(config.get('mode', 'input'))
+    modes = [default] * 8
+    for pin, mode in config.get('pins', {}).items():
+        pin = int(pin)
+        if not 0 <= pin < 8:
+            raise ValueError('Pin number has to be between 0 and 7')
+        modes[pin] = _mode(mode)
+
+    direction = 0
+    pullup = 0
+    for pin in range(8):
+        if modes[pin] != _MODES['output']:
+            direction |= 1 << pin
+        if modes[pin] == _MODES['input_pullup']:
+            pullup |= 1 << pin
+
+    return direction, pullup, int(config.get('value', 0)) & 0xFF
+
+
+def _mode(mode):
+    """
+    Function for converting a pin mode from a board description to one of
+    the PIN_* constants of the IO-expander classes. Both the names and the
+    numeric constants are accepted.
+    """
+
+    if type(mode) == str and mode in _MODES:
+        return _MODES[mode]
+    if type(mode) == int and mode in _MODES.values():
+        return mode
+    raise ValueError('Unknown pin mode: {}'.format(mode))
+
+
+########################### Class declarations ################################
+
+
+class Board:
+    """
+    Class that builds the devices of a board from a board description.
+    Devices are available by name, either through the device method or by
+    indexing the board. A device is created the first time it is used; the
+    I2C bus is likewise only initialised when the first I2C device is made.
+    After calling bring_up, the stats attribute holds the number of
+    configured devices, I2C transactions and shift register latches and the
+    time in milliseconds the bring-up took, summed over all calls.
+    """
+
+    def __init__(self, config):
+        """
+        Constructor for the board object. Nothing is instantiated here, the
+        description is only checked for mistakes such as duplicate or unknown
+        devices.
+        :param config: dict with the board description, see the module
+                       docstring for the format.
+        """
+
+        self.config = config
+        self._descriptions = {}
+        self._order = []
+        for description in config.get('devices', []):
+            Board._check(description)
+            name = description['name']
+            if name in self._descriptions:
+                raise ValueError('Duplicate device name: {}'.format(name))
+            self._descriptions[name] = description
+            self._order.append(name)
+
+        self._devices = {}
+        self._configured = set()
+        self._i2c = None
+        self.stats = None
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Creates a board object from a JSON file containing the description.
+        """
+
+        with open(filename) as file:
+            return cls(json.load(file))
+
+    def __getitem__(self, name):
+        return self.device(name)
+
+    def __contains__(self, name):
+        return name in self._descriptions
+
+    def names(self):
+        """
+        Returns the names of all described devices, in bring-up order.
+        """
+
+        return list(self._order)
+
+    def device(self, name):
+        """
+        Returns the driver object for the device with the given name. The
+        driver is created on the first call; later calls return the same
+        object. Creating a device does not configure it, that is done by
+        bring_up.
+        """
+
+        if name not in self._devices:
+            if name not in self._descriptions:
+                raise KeyError(name)
+            description = self._descriptions[name]
+            builder = Board._builders[description['type']]
+            self._devices[name] = builder(self, description)
+        return self._devices[name]
+
+    def bring_up(self):
+        """
+        Applies the initial configuration of all devices in the order of the
+        description. Devices that have already been brought up are skipped.
+        The counts and time of this call are added to the stats attribute.
+        :return: dict with the number of configured devices, the number of
+                 I2C transactions, the number of shift register latches and
+                 the elapsed time in milliseconds, summed over all calls.
+        """
+
+        start = time.ticks_ms()
+        transactions = 0
+        latches = 0
+        devices = 0
+
+        for name in self._order:
+            if name in self._configured:
+                continue
+            description = self._descriptions[name]
+            device = self.device(name)
+            if description['type'] == 'ShiftRegister':
+                latches += device.configure(int(description.get('value', 0)))
+            else:
+                if description['type'] == 'MCP23008':
+                    registers = _port_registers(description)
+                else:
+                    registers = zip(*[_port_registers(bank)
+                                      for bank in description['banks']])
+                transactions += device.configure(
+                    *registers,
+                    reset_iocon=bool(description.get('reset_iocon', False)),
+                    latch_first=bool(description.get('latch_first', False)))
+            self._configured.add(name)
+            devices += 1
+
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        if self.stats is None:
+            self.stats = {
+                'devices': 0,
+                'transactions': 0,
+                'latches': 0,
+                'elapsed_ms': 0,
+            }
+        self.stats['devices'] += devices
+        self.stats['transactions'] += transactions
+        self.stats['latches'] += latches
+        self.stats['elapsed_ms'] += elapsed
+        return self.stats
+
+    @staticmethod
+    def _check(description):
+        """
+        Checks a single device description, so mistakes are reported when
+        the board is made instead of being ignored or found on first use.
+        Keys that belong to another device type are refused.
+        """
+
+        if 'name' not in description:
+            raise ValueError('Device description without a name')
+        name = description['name']
+        kind = description.get('type')
+        if kind not in _KEYS:
+            raise ValueError('Device {}: unknown device type: {}'.format(
+                name, kind))
+
+        required, refused = _KEYS[kind]
+        for key in required:
+            if key not in description:
+                raise ValueError('{} {}: "{}" is required'.format(
+                    kind, name, key))
+        for key in refused:
+            if key in description:
+                raise ValueError('{} {}: "{}" is not used by a {}'.format(
+                    kind, name, key, kind))
+
+        if kind == 'MCP23017' and len(description['banks']) != 2:
+            raise ValueError('MCP23017 {}: "banks" needs exactly two '
+                             'entries'.format(name))
+        if kind == 'ShiftRegister':
+            for pin in _SHIFT_REGISTER_PINS:
+                if pin not in description['pins']:
+                    raise ValueError('ShiftRegister {}: pin "{}" is '
+                                     'required'.format(name, pin))
+
+    def _bus(self):
+        """
+        Returns the shared I2C object, initialising the peripheral on first
+        use with the settings from the i2c section of the description.
+        """
+
+        if self._i2c is None:
+            settings = self.config.get('i2c', {})
+            self._i2c = I2C(settings.get('bus', 0), I2C.MASTER,
+                            baudrate=settings.get('baudrate', 100000))
+        return self._i2c
+
+    def _make_mcp23008(self, description):
+        from MCP23008 import MCP23008
+        return MCP23008(description['address'], i2c=self._bus())
+
+    def _make_mcp23017(self, description):
+        from MCP23017 import MCP23017
+        return MCP23017(description['address'], i2c=self._bus())
+
+    def _make_shift_register(self, description):
+        from HC595 import ShiftRegister
+        pins = description['pins']
+        return ShiftRegister(pins['SER'], pins['SRCLK'], pins['RCLK'],
+                             pins['OE'], pins['SRCLR'],
+                             N_SR=description.get('count', 1),
+                             order=description.get('order'))
+
+    _builders = {
+        'MCP23008': _make_mcp23008,
+        'MCP23017': _make_mcp23017,
+        'ShiftRegister': _make_shift_register,
+    }
+
+
+################################# Main program ################################
+
+if __name__ == '__main__':
+    # run some test program
+    pass